@@ -1,12 +1,119 @@
 """Module to handle input and output of excel files"""
 
+import os
 import shutil
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any
 
-import pandas as pd
+import numpy as np
 from openpyxl import load_workbook
 
 import excelshifts.state as state
 
+# Shift type name -> shift index, as stored in Instance.presets
+_SHIFT_INDEX = {t.name: t.value for t in state.ShiftType}
+
+
+def _read_sheet(file_path: str, sheet_name: str) -> tuple[tuple[Any, ...], ...]:
+    """Reads the cell values of a sheet, reusing them while the file is unchanged.
+
+    args:
+        file_path: The path to the Excel file
+        sheet_name: The name of the sheet to load data from
+
+    returns:
+        The rows of the sheet as tuples of cell values, starting at row 1
+    """
+    return _read_sheet_cached(file_path, sheet_name, os.path.getmtime(file_path))
+
+
+@lru_cache(maxsize=8)
+def _read_sheet_cached(
+    file_path: str, sheet_name: str, mtime: float
+) -> tuple[tuple[Any, ...], ...]:
+    return _stream_rows(file_path, sheet_name)
+
+
+def _stream_rows(
+    file_path: str, sheet_name: str, **bounds: int
+) -> tuple[tuple[Any, ...], ...]:
+    """Streams cell values from a read-only workbook, optionally within bounds.
+
+    `bounds` are forwarded to `iter_rows` (min_row, max_row, min_col, max_col).
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            raise ValueError(f"Sheet '{sheet_name}' not found in the workbook.")
+        ws = wb[sheet_name]
+        if not bounds:
+            # Read-only sheets trust the stored <dimension> record, which other
+            # tools often leave stale; rescan the cells for the real extent
+            ws.reset_dimensions()
+        return tuple(ws.iter_rows(values_only=True, **bounds))
+    finally:
+        wb.close()
+
+
+def _read_window(
+    file_path: str,
+    sheet_name: str,
+    min_row: int,
+    max_row: int,
+    min_col: int,
+    max_col: int,
+) -> list[list[Any]]:
+    """Reads a block of cell values, with 1-based inclusive bounds.
+
+    Rows past the end of the sheet are not returned; missing cells in the
+    returned rows are filled with None.
+    """
+    width = max_col - min_col + 1
+    window = []
+    for row in _read_sheet(file_path, sheet_name)[min_row - 1 : max_row]:
+        cells = list(row[min_col - 1 : max_col])
+        cells.extend([None] * (width - len(cells)))
+        window.append(cells)
+    return window
+
+
+def _read_grid(
+    file_path: str,
+    sheet_name: str,
+    row_start: int,
+    col_start: int,
+    n_residents: int,
+    n_days: int,
+) -> np.ndarray:
+    """Reads the (resident, day) assignment grid as a 2D object array."""
+    window = _read_window(
+        file_path,
+        sheet_name,
+        row_start,
+        row_start + n_residents - 1,
+        col_start,
+        col_start + n_days - 1,
+    )
+    return np.array(window, dtype=object).reshape(len(window), n_days)
+
+
+def _grid_positions(grid: np.ndarray, types: list[str]) -> tuple[tuple[int, int], ...]:
+    """Returns the (resident_index, day_index) cells holding one of `types`."""
+    rows, cols = np.nonzero(np.isin(grid, types))
+    return tuple(zip(rows.tolist(), cols.tolist()))
+
+
+def _grid_presets(grid: np.ndarray) -> tuple[tuple[int, int, int], ...]:
+    """Returns the (resident_index, day_index, shift_index) cells holding a shift."""
+    # Encode the grid as shift indices (-1 for anything else), one compare per type
+    codes = np.full(grid.shape, -1, dtype=np.int8)
+    for name, index in _SHIFT_INDEX.items():
+        codes[grid == name] = index
+
+    rows, cols = np.nonzero(codes >= 0)
+    return tuple(zip(rows.tolist(), cols.tolist(), codes[rows, cols].tolist()))
+
 
 def load_residents(
     file_path: str, sheet_name: str, start: int, n_residents: int
@@ -23,18 +130,20 @@ def load_residents(
         A tuple of Resident objects
     """
 
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine="openpyxl")
+    rows = _read_window(file_path, sheet_name, start, start + n_residents - 1, 1, 2)
+    if len(rows) != n_residents:
+        raise ValueError(
+            f"Sheet '{sheet_name}' has {len(rows)} of the {n_residents} resident rows "
+            f"expected in rows {start}-{start + n_residents - 1}."
+        )
 
-    ROW_BOUNDS = (start - 1, start + n_residents - 2)
+    if not rows:
+        return ()
+    rank_column, names = zip(*rows)
 
-    residents = []
-    for row_pos in range(df.shape[0]):
-        row = df.iloc[row_pos]
-        if is_rowcol_in_bounds(row_pos, ROW_BOUNDS):
-            if pd.notna(row[0]):
-                lastrank = row[0]
-            residents.append(state.Resident(row[1], lastrank))
-    return tuple(residents)
+    # Ranks are only written on the first row of each group; forward-fill them
+    ranks = accumulate(rank_column, lambda last, rank: last if rank is None else rank)
+    return tuple(map(state.Resident, names, ranks))
 
 
 def load_days(
@@ -52,19 +161,20 @@ def load_days(
         A tuple of Day objects
     """
 
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine="openpyxl")
+    rows = _read_window(file_path, sheet_name, 2, 3, start, start + n_days - 1)
+    if len(rows) != 2:
+        raise ValueError(
+            f"Sheet '{sheet_name}' is missing the day number/weekday rows 2-3 "
+            f"(columns {start}-{start + n_days - 1})."
+        )
+    number_row, weekday_row = rows
 
-    COL_BOUNDS = (start - 1, start + n_days - 1)
-
-    day_numbers = df.iloc[1, COL_BOUNDS[0] : COL_BOUNDS[1]].dropna().tolist()
-    weekdays = df.iloc[2, COL_BOUNDS[0] : COL_BOUNDS[1]].dropna().tolist()
-
-    days = [
+    # Pair number and weekday per column so a blank cell cannot shift the rest
+    return tuple(
         state.Day(number, weekday.strip())
-        for number, weekday in zip(day_numbers, weekdays)
-    ]
-
-    return tuple(days)
+        for number, weekday in zip(number_row, weekday_row)
+        if number is not None and weekday is not None
+    )
 
 
 def load_restrictions(
@@ -91,21 +201,8 @@ def load_restrictions(
         A tuple of restricted (resident_index, day_index) tuples with the restrictions
     """
 
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine="openpyxl")
-
-    ROW_OFFSET = row_start - 1
-    COL_OFFSET = col_start - 1
-
-    ROW_BOUNDS = (ROW_OFFSET, n_residents + ROW_OFFSET - 1)
-    COL_BOUNDS = (COL_OFFSET, n_days + COL_OFFSET - 1)
-
-    positions = [
-        (row_pos - ROW_OFFSET, col_pos - COL_OFFSET)
-        for row_pos in range(df.shape[0])
-        for col_pos, cell in enumerate(df.iloc[row_pos])
-        if is_cell_in_bounds(row_pos, col_pos, ROW_BOUNDS, COL_BOUNDS) and cell in types
-    ]
-    return tuple(positions)
+    grid = _read_grid(file_path, sheet_name, row_start, col_start, n_residents, n_days)
+    return _grid_positions(grid, types)
 
 
 def load_external_rotations(
@@ -159,54 +256,8 @@ def load_preset_shifts(
         A tuple of (resident_index, day_index, shift_index) tuples with the preset shifts
     """
 
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine="openpyxl")
-
-    ROW_OFFSET = row_start - 1
-    COL_OFFSET = col_start - 1
-
-    ROW_BOUNDS = (ROW_OFFSET, n_residents + ROW_OFFSET - 1)
-    COL_BOUNDS = (COL_OFFSET, n_days + COL_OFFSET - 1)
-
-    positions = [
-        (row_pos - ROW_OFFSET, col_pos - COL_OFFSET, state.ShiftType[cell].value)
-        for row_pos in range(df.shape[0])
-        for col_pos, cell in enumerate(df.iloc[row_pos])
-        if is_cell_in_bounds(row_pos, col_pos, ROW_BOUNDS, COL_BOUNDS)
-        and cell in list(state.ShiftType.__members__)
-    ]
-    return tuple(positions)
-
-
-def is_cell_in_bounds(
-    row_idx: int, col_idx: int, row_bounds: tuple[int, int], col_bounds: tuple[int, int]
-) -> bool:
-    """Check if a cell is in the bounds of the table
-
-    args:
-        row_idx: The row index of the cell
-        col_idx: The column index of the cell
-        row_bounds: The bounds of the rows
-        col_bounds: The bounds of the columns
-
-    returns:
-        True if the cell is in the bounds, False otherwise
-    """
-    return is_rowcol_in_bounds(row_idx, row_bounds) and is_rowcol_in_bounds(
-        col_idx, col_bounds
-    )
-
-
-def is_rowcol_in_bounds(idx: int, bounds: tuple[int, int]) -> bool:
-    """Check if a row or column is in the bounds of the table
-
-    args:
-        idx: The row or column index
-        bounds: The bounds of the row or column
-
-    returns:
-        True if the row or column is in the bounds, False otherwise
-    """
-    return bounds[0] <= idx <= bounds[1]
+    grid = _read_grid(file_path, sheet_name, row_start, col_start, n_residents, n_days)
+    return _grid_presets(grid)
 
 
 def load_totals(
@@ -225,21 +276,16 @@ def load_totals(
         A matrix of total shifts of each type for each resident, rows are residents, columns are shift types
     """
 
-    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None, engine="openpyxl")
-
-    ROW_BOUNDS = (row_start - 1, row_start + n_residents - 2)
-    COL_BOUNDS = (col_start - 1, col_start + len(state.ShiftType) - 2)
-
-    totals = []
-    for row_pos in range(df.shape[0]):
-        row = df.iloc[row_pos]
-        if is_rowcol_in_bounds(row_pos, ROW_BOUNDS):
-            shifts = []
-            for col_idx, cell in enumerate(row):
-                if is_rowcol_in_bounds(col_idx, COL_BOUNDS):
-                    shifts.append(cell)
-            totals.append(shifts)
-    return totals
+    # The totals sheet is read by nobody else, so stream just the block uncached
+    rows = _stream_rows(
+        file_path,
+        sheet_name,
+        min_row=row_start,
+        max_row=row_start + n_residents - 1,
+        min_col=col_start,
+        max_col=col_start + len(state.ShiftType) - 1,
+    )
+    return [list(row) for row in rows]
 
 
 def copy_excel_file(original_path: str, fname_extension: str):
@@ -256,7 +302,7 @@ def copy_excel_file(original_path: str, fname_extension: str):
     new_path = original_path[:-5] + fname_extension + ".xlsx"
 
     # Copy the file
-    shutil.copy2(original_path, new_path)
+    shutil.copyfile(original_path, new_path)
 
     return new_path  # Return the path of the copied file
 
@@ -287,16 +333,12 @@ def save_shifts(
 
     sheet = wb[sheet_name]
 
-    ROW_OFFSET = row_start - 1
-    COL_OFFSET = col_start - 1
-
-    for i, row in enumerate(shift_matrix):
-        for j, shift in enumerate(row):
+    for row_idx, row in enumerate(shift_matrix, start=row_start):
+        for col_idx, shift in enumerate(row, start=col_start):
             if shift:
-                sheet.cell(
-                    row=i + ROW_OFFSET + 1, column=j + COL_OFFSET + 1, value=shift
-                )
+                sheet.cell(row=row_idx, column=col_idx).value = shift
 
+    # Serialize the workbook once, after all cells have been written
     wb.save(file_path)
 
 
@@ -329,49 +371,16 @@ def load_instance(
     residents = load_residents(file_path, sheet_name, residents_start, n_residents)
     days = load_days(file_path, sheet_name, days_start, n_days)
 
-    # Restrictions & presets within the grid
-    v_positions = load_restrictions(
-        file_path,
-        sheet_name,
-        ["V"],
-        grid_row_start,
-        grid_col_start,
-        n_residents,
-        n_days,
-    )
-    u_positions = load_restrictions(
-        file_path,
-        sheet_name,
-        ["U"],
-        grid_row_start,
-        grid_col_start,
-        n_residents,
-        n_days,
-    )
-    ut_positions = load_restrictions(
-        file_path,
-        sheet_name,
-        ["UT"],
-        grid_row_start,
-        grid_col_start,
-        n_residents,
-        n_days,
-    )
-    p_positions = load_restrictions(
-        file_path,
-        sheet_name,
-        ["P"],
-        grid_row_start,
-        grid_col_start,
-        n_residents,
-        n_days,
-    )
-    external_rotations = load_external_rotations(
-        file_path, sheet_name, grid_row_start, grid_col_start, n_residents, n_days
-    )
-    presets = load_preset_shifts(
+    # Restrictions & presets within the grid, read once and shared by every type
+    grid = _read_grid(
         file_path, sheet_name, grid_row_start, grid_col_start, n_residents, n_days
     )
+    v_positions = _grid_positions(grid, ["V"])
+    u_positions = _grid_positions(grid, ["U"])
+    ut_positions = _grid_positions(grid, ["UT"])
+    p_positions = _grid_positions(grid, ["P"])
+    external_rotations = frozenset(i for i, _ in _grid_positions(grid, ["E"]))
+    presets = _grid_presets(grid)
 
     return state.Instance(
         residents=residents,
@@ -9,15 +9,14 @@ No objective is defined here; callers may set one (e.g., maximize coverage).
 
 from typing import Any, Dict, Tuple
 
+import numpy as np
 from ortools.sat.python import cp_model
 
 import excelshifts.state as state
 from excelshifts.model.constraints import BaseRule, apply_rules
 from excelshifts.model.variables import create_shifts
 
-essential_return = Tuple[
-    cp_model.CpModel, Dict[tuple[int, int, int], Any], Dict[str, Any]
-]
+essential_return = Tuple[cp_model.CpModel, np.ndarray, Dict[str, Any]]
 
 
 def build_model(
@@ -38,8 +37,8 @@ def build_model(
     -------
     model : cp_model.CpModel
         The constructed CP-SAT model.
-    shifts : Dict[(i,j,k), BoolVar]
-        Decision variables mapping (resident, day, shift_type_index) -> BoolVar.
+    shifts : np.ndarray
+        Decision variables indexed [resident, day, shift_type_index] -> BoolVar.
     enables : Dict[str, Any]
         Mapping rule_id -> enable literal (0/1 var) returned by its builder.
     """
@@ -3,8 +3,29 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, ClassVar, Iterable, Mapping, Optional
 
+import numpy as np
+from ortools.sat.python.cp_model import LinearExpr
+
 import excelshifts.state as state
 
+# Shift type names accepted in rule params
+_SHIFT_NAMES = frozenset(state.ShiftType.__members__)
+
+# Shift type indices, bound once so rule loops never iterate the Enum
+_K_ALL = range(len(state.ShiftType))
+_K_R = state.ShiftType.R.value
+_K_G = state.ShiftType.G.value
+_K_T = state.ShiftType.T.value
+_K_NON_R = [k for k in _K_ALL if k != _K_R]
+
+
+def _forbid(model, enable, lits) -> None:
+    """Fix every literal in `lits` to 0 under `enable`, as a single constraint."""
+    # Blocks around neighbouring U/UT days overlap; post each cell only once
+    lits = list({lit.Index(): lit for lit in lits}.values())
+    if lits:
+        model.AddBoolAnd([lit.Not() for lit in lits]).OnlyEnforceIf(enable)
+
 
 @dataclass(frozen=True, slots=True)
 class BaseRule:
@@ -177,11 +198,11 @@ class OneShiftPerDay(BaseRule):
         enable = self.new_enable(model)
         residents = instance.residents
         days = instance.days
-        for i, _ in enumerate(residents):
-            for j, _ in enumerate(days):
-                lits = [shifts[(i, j, k)] for k, _ in enumerate(state.ShiftType)]
+        for i in range(len(residents)):
+            for j in range(len(days)):
+                lits = shifts[i, j, :].tolist()
                 if lits:
-                    model.Add(sum(lits) <= 1).OnlyEnforceIf(enable)
+                    model.AddAtMostOne(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -192,9 +213,7 @@ class RestrictedDayOff(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         v_positions = instance.v_positions
-        for i, j in v_positions:
-            for k, _ in enumerate(state.ShiftType):
-                model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
+        _forbid(model, enable, (lit for i, j in v_positions for lit in shifts[i, j]))
         return enable
 
 
@@ -204,15 +223,8 @@ class NoROnWeekendsOrHolidays(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
-        days = instance.days
-        p_days = instance.p_days
-        for i, _ in enumerate(residents):
-            for j, day in enumerate(days):
-                if day.day_of_week in ["S", "D"] or j in p_days:
-                    for k, t in enumerate(state.ShiftType):
-                        if t == state.ShiftType.R:
-                            model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
+        off_days = sorted(set(instance.day_indices("S", "D")) | instance.p_days)
+        _forbid(model, enable, shifts[:, off_days, _K_R].flat)
         return enable
 
 
@@ -224,16 +236,11 @@ class RestAfterAnyShift(BaseRule):
         enable = self.new_enable(model)
         residents = instance.residents
         days = instance.days
-        for i, _ in enumerate(residents):
-            for j, _ in enumerate(days):
-                if j < len(days) - 1:
-                    model.Add(
-                        sum(shifts[(i, j, k)] for k, _ in enumerate(state.ShiftType))
-                        + sum(
-                            shifts[(i, j + 1, k)] for k, _ in enumerate(state.ShiftType)
-                        )
-                        <= 1
-                    ).OnlyEnforceIf(enable)
+        for i in range(len(residents)):
+            for j in range(len(days) - 1):
+                model.AddAtMostOne(
+                    shifts[i, j : j + 2, :].ravel().tolist()
+                ).OnlyEnforceIf(enable)
         return enable
 
 
@@ -245,12 +252,13 @@ class BlockAroundEmergencyU(BaseRule):
         enable = self.new_enable(model)
         u_positions = instance.u_positions
         days = instance.days
+        lits = []
         for i, j in u_positions:
-            for k, _ in enumerate(state.ShiftType):
-                model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
-                if 0 < j < len(days) - 1:
-                    model.Add(shifts[(i, j + 1, k)] == 0).OnlyEnforceIf(enable)
-                    model.Add(shifts[(i, j - 1, k)] == 0).OnlyEnforceIf(enable)
+            if 0 < j < len(days) - 1:
+                lits.extend(shifts[i, j - 1 : j + 2].flat)
+            else:
+                lits.extend(shifts[i, j])
+        _forbid(model, enable, lits)
         return enable
 
 
@@ -261,11 +269,10 @@ class BlockAroundEmergencyUT(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         ut_positions = instance.ut_positions
+        lits = []
         for i, j in ut_positions:
-            for k, _ in enumerate(state.ShiftType):
-                model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
-                if j > 0:
-                    model.Add(shifts[(i, j - 1, k)] == 0).OnlyEnforceIf(enable)
+            lits.extend(shifts[i, max(j - 1, 0) : j + 1].flat)
+        _forbid(model, enable, lits)
         return enable
 
 
@@ -275,14 +282,8 @@ class ExternalRotationOff(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
-        days = instance.days
-        external = instance.external_rotations
-        for i, _ in enumerate(residents):
-            if i in external:
-                for j, _ in enumerate(days):
-                    for k, _ in enumerate(state.ShiftType):
-                        model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
+        external = sorted(instance.external_rotations)
+        _forbid(model, enable, shifts[external].flat)
         return enable
 
 
@@ -295,13 +296,12 @@ class AtMostOneResidentPerShiftPerDay(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
         days = instance.days
-        for j, _ in enumerate(days):
-            for k, _ in enumerate(state.ShiftType):
-                lits = [shifts[(i, j, k)] for i, _ in enumerate(residents)]
+        for j in range(len(days)):
+            for k in _K_ALL:
+                lits = shifts[:, j, k].tolist()
                 if lits:
-                    model.Add(sum(lits) <= 1).OnlyEnforceIf(enable)
+                    model.AddAtMostOne(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -311,17 +311,11 @@ class CoverGorTEachDay(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
         days = instance.days
-        for j, _ in enumerate(days):
-            lits = [
-                shifts[(i, j, k)]
-                for i, _ in enumerate(residents)
-                for k, t in enumerate(state.ShiftType)
-                if t.name in ["G", "T"]
-            ]
+        for j in range(len(days)):
+            lits = shifts[:, j, [_K_G, _K_T]].ravel().tolist()
             if lits:
-                model.Add(sum(lits) >= 1).OnlyEnforceIf(enable)
+                model.AddBoolOr(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -336,12 +330,8 @@ class SeniorGorTRequiresOtherCoverage(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
         days = instance.days
 
-        k_G = state.ShiftType.G.value
-        k_T = state.ShiftType.T.value
-
         ranks_param = self.params.get("ranks")
         if not isinstance(ranks_param, (list, tuple)) or not ranks_param:
             raise ValueError(
@@ -349,26 +339,21 @@ class SeniorGorTRequiresOtherCoverage(BaseRule):
             )
         senior_ranks = {str(x) for x in ranks_param}
 
-        for i, r in enumerate(residents):
-            if getattr(r, "rank", None) in senior_ranks:
-                for j, _ in enumerate(days):
-                    # If i does G on day j, someone else must do T on day j
-                    lits_T_others = [
-                        shifts[(h, j, k_T)] for h, _ in enumerate(residents) if h != i
-                    ]
-                    if lits_T_others:
-                        model.Add(sum(lits_T_others) >= 1).OnlyEnforceIf(
-                            [enable, shifts[(i, j, k_G)]]
-                        )
-
-                    # If i does T on day j, someone else must do G on day j
-                    lits_G_others = [
-                        shifts[(h, j, k_G)] for h, _ in enumerate(residents) if h != i
-                    ]
-                    if lits_G_others:
-                        model.Add(sum(lits_G_others) >= 1).OnlyEnforceIf(
-                            [enable, shifts[(i, j, k_T)]]
-                        )
+        for i in instance.resident_indices(*senior_ranks):
+            for j in range(len(days)):
+                # If i does G on day j, someone else must do T on day j
+                lits_T_others = np.delete(shifts[:, j, _K_T], i).tolist()
+                if lits_T_others:
+                    model.AddBoolOr(lits_T_others).OnlyEnforceIf(
+                        [enable, shifts[(i, j, _K_G)]]
+                    )
+
+                # If i does T on day j, someone else must do G on day j
+                lits_G_others = np.delete(shifts[:, j, _K_G], i).tolist()
+                if lits_G_others:
+                    model.AddBoolOr(lits_G_others).OnlyEnforceIf(
+                        [enable, shifts[(i, j, _K_T)]]
+                    )
 
         return enable
 
@@ -379,18 +364,12 @@ class MinAssignmentsPerDay(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
-        days = instance.days
-        p_days = instance.p_days
-        for j, day in enumerate(days):
-            rhs = 1 if (day.day_of_week in ["V", "S", "D"] or j in p_days) else 2
+        # Fridays, weekends and holidays need one assignment less than other days
+        light = np.isin(instance.weekdays, ("V", "S", "D"))
+        light[sorted(instance.p_days)] = True
+        for j, rhs in enumerate(np.where(light, 1, 2).tolist()):
             model.Add(
-                sum(
-                    shifts[(i, j, k)]
-                    for i, _ in enumerate(residents)
-                    for k, _ in enumerate(state.ShiftType)
-                )
-                > rhs
+                LinearExpr.Sum(shifts[:, j, :].ravel().tolist()) > rhs
             ).OnlyEnforceIf(enable)
         return enable
 
@@ -401,17 +380,13 @@ class NotSameTypeUncoveredBothWeekendDays(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        residents = instance.residents
         days = instance.days
-        for j, day in enumerate(days):
-            if day.day_of_week == "S" and j < len(days) - 1:
-                for k, t in enumerate(state.ShiftType):
-                    if t.name != "R":
-                        w1 = [shifts[(i, j, k)] for i, _ in enumerate(residents)]
-                        w2 = [shifts[(i, j + 1, k)] for i, _ in enumerate(residents)]
-                        lits = w1 + w2
-                        if lits:
-                            model.Add(sum(lits) >= 1).OnlyEnforceIf(enable)
+        saturdays = [j for j in instance.day_indices("S") if j < len(days) - 1]
+        for j in saturdays:
+            for k in _K_NON_R:
+                lits = shifts[:, j : j + 2, k].ravel().tolist()
+                if lits:
+                    model.AddBoolOr(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -425,8 +400,9 @@ class EnforcePresets(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         # Enforce given presets for everyone (exactly those cells must be 1)
-        for i, j, k in instance.presets:
-            model.Add(shifts[(i, j, k)] == 1).OnlyEnforceIf(enable)
+        lits = [shifts[i, j, k] for i, j, k in instance.presets]
+        if lits:
+            model.AddBoolAnd(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -441,11 +417,18 @@ class OnlyPresetsForTargets(BaseRule):
         if not target_ids:
             return enable
         # For targeted residents, forbid any non-preset shifts ("only presets")
-        for i in target_ids:
-            for j, _ in enumerate(days):
-                for k, _ in enumerate(state.ShiftType):
-                    if (i, j, k) not in instance.presets:
-                        model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
+        presets = set(instance.presets)
+        _forbid(
+            model,
+            enable,
+            (
+                shifts[i, j, k]
+                for i in sorted(target_ids)
+                for j in range(len(days))
+                for k in _K_ALL
+                if (i, j, k) not in presets
+            ),
+        )
         return enable
 
 
@@ -457,9 +440,7 @@ class HolidayAssignedMustWork(BaseRule):
         enable = self.new_enable(model)
         p_positions = instance.p_positions
         for i, j in p_positions:
-            model.Add(
-                sum(shifts[(i, j, k)] for k, _ in enumerate(state.ShiftType)) == 1
-            ).OnlyEnforceIf(enable)
+            model.AddExactlyOne(shifts[i, j, :].tolist()).OnlyEnforceIf(enable)
         return enable
 
 
@@ -469,7 +450,6 @@ class TotalNumberOfShifts(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
         end_of_month = instance.end_of_month
 
         params = dict(self.params or {})
@@ -486,28 +466,21 @@ class TotalNumberOfShifts(BaseRule):
             return enable
 
         # Always adjust: U counts as 1, every two UT count as 1 (pairs)
-        u_count = {i: 0 for i in target_ids}
-        ut_count = {i: 0 for i in target_ids}
-        for ri, _ in instance.u_positions:
-            if ri in u_count:
-                u_count[ri] += 1
-        for ri, _ in instance.ut_positions:
-            if ri in ut_count:
-                ut_count[ri] += 1
+        n_residents = len(instance.residents)
+        u_count = np.bincount(
+            np.fromiter((ri for ri, _ in instance.u_positions), dtype=int),
+            minlength=n_residents,
+        )
+        ut_count = np.bincount(
+            np.fromiter((ri for ri, _ in instance.ut_positions), dtype=int),
+            minlength=n_residents,
+        )
+        rhs = np.maximum(base_total - u_count - ut_count // 2, 0)
 
         for i in target_ids:
-            rhs = base_total - u_count.get(i, 0) - (ut_count.get(i, 0) // 2)
-            if rhs < 0:
-                rhs = 0
+            lits = shifts[i, :end_of_month, :].ravel().tolist()
 
-            lits = [
-                shifts[(i, j, k)]
-                for j, _ in enumerate(days)
-                if j < end_of_month
-                for k, _ in enumerate(state.ShiftType)
-            ]
-
-            model.Add(sum(lits) == rhs).OnlyEnforceIf(enable)
+            model.Add(LinearExpr.Sum(lits) == int(rhs[i])).OnlyEnforceIf(enable)
 
         return enable
 
@@ -521,7 +494,6 @@ class TargetsDoAtLeastOfType(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
         end_of_month = instance.end_of_month
 
         # required param: list of shift type names, e.g., ["R", "G", "T"]
@@ -531,22 +503,19 @@ class TargetsDoAtLeastOfType(BaseRule):
                 "targets_do_at_least_of_type requires a non-empty list param 'types'"
             )
         wanted = {str(x).upper() for x in types_param}
-        known = {t.name for t in state.ShiftType}
-        unknown = wanted - known
+        unknown = wanted - _SHIFT_NAMES
         if unknown:
             raise ValueError(
-                f"Unknown shift types in 'types': {sorted(unknown)}; known={sorted(known)}"
+                f"Unknown shift types in 'types': {sorted(unknown)}; known={sorted(_SHIFT_NAMES)}"
             )
-        k_list = [k for k, t in enumerate(state.ShiftType) if t.name in wanted]
+        k_list = sorted(state.ShiftType[name].value for name in wanted)
 
         target_ids = [i for i, _ in self.targets(instance)]
         for i in target_ids:
             for k in k_list:
-                lits = [
-                    shifts[(i, j, k)] for j, _ in enumerate(days) if j < end_of_month
-                ]
+                lits = shifts[i, :end_of_month, k].tolist()
                 if lits:
-                    model.Add(sum(lits) >= 1).OnlyEnforceIf(enable)
+                    model.AddBoolOr(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -556,7 +525,6 @@ class TargetsDoNotDoType(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
 
         # required param: list of shift type names to forbid entirely
         types_param = self.params.get("types")
@@ -565,19 +533,15 @@ class TargetsDoNotDoType(BaseRule):
                 "targets_do_not_do_type requires a non-empty list param 'types'"
             )
         wanted = {str(x).upper() for x in types_param}
-        known = {t.name for t in state.ShiftType}
-        unknown = wanted - known
+        unknown = wanted - _SHIFT_NAMES
         if unknown:
             raise ValueError(
-                f"Unknown shift types in 'types': {sorted(unknown)}; known={sorted(known)}"
+                f"Unknown shift types in 'types': {sorted(unknown)}; known={sorted(_SHIFT_NAMES)}"
             )
-        k_list = [k for k, t in enumerate(state.ShiftType) if t.name in wanted]
+        k_list = sorted(state.ShiftType[name].value for name in wanted)
 
         target_ids = [i for i, _ in self.targets(instance)]
-        for i in target_ids:
-            for j, _ in enumerate(days):
-                for k in k_list:
-                    model.Add(shifts[(i, j, k)] == 0).OnlyEnforceIf(enable)
+        _forbid(model, enable, shifts[target_ids][:, :, k_list].flat)
         return enable
 
 
@@ -587,17 +551,11 @@ class MaxTwoPerTypeForTargets(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
         end_of_month = instance.end_of_month
         for i, _ in self.targets(instance):
-            for k, _ in enumerate(state.ShiftType):
+            for k in _K_ALL:
                 model.Add(
-                    sum(
-                        shifts[(i, j, k)]
-                        for j, _ in enumerate(days)
-                        if j < end_of_month
-                    )
-                    <= 2
+                    LinearExpr.Sum(shifts[i, :end_of_month, k].tolist()) <= 2
                 ).OnlyEnforceIf(enable)
         return enable
 
@@ -611,17 +569,12 @@ class AtLeastOneWeekendForTargets(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
         end_of_month = instance.end_of_month
+        weekend_js = [j for j in instance.day_indices("S", "D") if j < end_of_month]
         for i, _ in self.targets(instance):
-            lits = [
-                shifts[(i, j, k)]
-                for j, d in enumerate(days)
-                if d.day_of_week in ["S", "D"] and j < end_of_month
-                for k, _ in enumerate(state.ShiftType)
-            ]
+            lits = shifts[i, weekend_js, :].ravel().tolist()
             if lits:
-                model.Add(sum(lits) >= 1).OnlyEnforceIf(enable)
+                model.AddBoolOr(lits).OnlyEnforceIf(enable)
         return enable
 
 
@@ -632,19 +585,14 @@ class FridayRequiresSunday(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         days = instance.days
+        fridays = [j for j in instance.day_indices("V") if j + 2 < len(days)]
         for i, _ in self.targets(instance):
-            for j, day in enumerate(days):
-                if day.day_of_week == "V" and j + 2 < len(days):
-                    model.Add(
-                        sum(
-                            shifts[(i, j, k)]
-                            for k, t in enumerate(state.ShiftType)
-                            if t != state.ShiftType.R
-                        )
-                        == sum(
-                            shifts[(i, j + 2, k)] for k, _ in enumerate(state.ShiftType)
-                        )
-                    ).OnlyEnforceIf(enable)
+            for j in fridays:
+                friday_lits = shifts[i, j, _K_NON_R].tolist()
+                sunday_lits = shifts[i, j + 2, :].tolist()
+                model.Add(
+                    LinearExpr.Sum(friday_lits) == LinearExpr.Sum(sunday_lits)
+                ).OnlyEnforceIf(enable)
         return enable
 
 
@@ -655,13 +603,13 @@ class SundayDifferentTypeThanFriday(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         days = instance.days
+        fridays = [j for j in instance.day_indices("V") if j + 2 < len(days)]
         for i, _ in self.targets(instance):
-            for j, day in enumerate(days):
-                if day.day_of_week == "V" and j + 2 < len(days):
-                    for k, _ in enumerate(state.ShiftType):
-                        model.Add(
-                            shifts[(i, j, k)] + shifts[(i, j + 2, k)] <= 1
-                        ).OnlyEnforceIf(enable)
+            for j in fridays:
+                for k in _K_ALL:
+                    model.AddImplication(
+                        shifts[i, j, k], shifts[i, j + 2, k].Not()
+                    ).OnlyEnforceIf(enable)
         return enable
 
 
@@ -672,16 +620,12 @@ class BlockMondayAfterSaturdayShiftTargets(BaseRule):
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
         days = instance.days
+        saturdays = [j for j in instance.day_indices("S") if j + 2 < len(days)]
         for i, _ in self.targets(instance):
-            for j, day in enumerate(days):
-                if day.day_of_week == "S" and j + 2 < len(days):
-                    model.Add(
-                        sum(shifts[(i, j, k)] for k, _ in enumerate(state.ShiftType))
-                        + sum(
-                            shifts[(i, j + 2, k)] for k, _ in enumerate(state.ShiftType)
-                        )
-                        <= 1
-                    ).OnlyEnforceIf(enable)
+            for j in saturdays:
+                model.AddAtMostOne(
+                    shifts[i, [j, j + 2], :].ravel().tolist()
+                ).OnlyEnforceIf(enable)
         return enable
 
 
@@ -694,10 +638,12 @@ class BlockMondayAfterSatEmergency(BaseRule):
         u_positions = instance.u_positions
         days = instance.days
         target_ids = {i for i, _ in self.targets(instance)}
+        saturdays = set(instance.day_indices("S"))
+        lits = []
         for i, j in u_positions:
-            if i in target_ids and days[j].day_of_week == "S" and j < len(days) - 2:
-                for k, _ in enumerate(state.ShiftType):
-                    model.Add(shifts[(i, j + 2, k)] == 0).OnlyEnforceIf(enable)
+            if i in target_ids and j in saturdays and j < len(days) - 2:
+                lits.extend(shifts[i, j + 2])
+        _forbid(model, enable, lits)
         return enable
 
 
@@ -707,7 +653,6 @@ class MaxWeekendShiftsForTargets(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
 
         # required param: maximum number of weekend shifts per targeted resident
         try:
@@ -719,18 +664,14 @@ class MaxWeekendShiftsForTargets(BaseRule):
         if max_weekend < 0:
             raise ValueError("'max' must be a non-negative integer")
 
-        weekend_js = [j for j, d in enumerate(days) if d.day_of_week in ["S", "D"]]
+        weekend_js = instance.day_indices("S", "D")
 
         # Constraints per targeted resident
         for i, _ in self.targets(instance):
-            lits = [
-                shifts[(i, j, k)]
-                for j in weekend_js
-                for k, _ in enumerate(state.ShiftType)
-            ]
+            lits = shifts[i, weekend_js, :].ravel().tolist()
 
             if lits:
-                model.Add(sum(lits) <= max_weekend).OnlyEnforceIf(enable)
+                model.Add(LinearExpr.Sum(lits) <= max_weekend).OnlyEnforceIf(enable)
 
         return enable
 
@@ -742,28 +683,20 @@ class WeekendBalanceForTargets(BaseRule):
 
     def apply(self, model, instance, shifts):
         enable = self.new_enable(model)
-        days = instance.days
         end_of_month = instance.end_of_month
 
         # Collect Saturday and Sunday indices in the planning horizon, strictly before end_of_month
-        sat_js = [
-            j for j, d in enumerate(days) if j < end_of_month and d.day_of_week == "S"
-        ]
-        sun_js = [
-            j for j, d in enumerate(days) if j < end_of_month and d.day_of_week == "D"
-        ]
+        sat_js = [j for j in instance.day_indices("S") if j < end_of_month]
+        sun_js = [j for j in instance.day_indices("D") if j < end_of_month]
 
         for i, _ in self.targets(instance):
-            sat_lits = [
-                shifts[(i, j, k)] for j in sat_js for k, _ in enumerate(state.ShiftType)
-            ]
-            sun_lits = [
-                shifts[(i, j, k)] for j in sun_js for k, _ in enumerate(state.ShiftType)
-            ]
+            sat_lits = shifts[i, sat_js, :].ravel().tolist()
+            sun_lits = shifts[i, sun_js, :].ravel().tolist()
 
-            # |#Sat - #Sun| <= 1  <=>  (#Sat - #Sun <= 1) and (#Sun - #Sat <= 1)
-            model.Add(sum(sat_lits) - sum(sun_lits) <= 1).OnlyEnforceIf(enable)
-            model.Add(sum(sun_lits) - sum(sat_lits) <= 1).OnlyEnforceIf(enable)
+            # |#Sat - #Sun| <= 1  <=>  -1 <= #Sat - #Sun <= 1, as one ranged constraint
+            model.AddLinearConstraint(
+                LinearExpr.Sum(sat_lits) - LinearExpr.Sum(sun_lits), -1, 1
+            ).OnlyEnforceIf(enable)
 
         return enable
 
@@ -792,21 +725,23 @@ class NoMShiftsInNDays(BaseRule):
         if n_days > len(days):
             raise ValueError("'n_days' is larger the number of days in the month")
 
+        # Running count of U days per resident (u_cum[i, j] = U days before day j),
+        # so the U days in any window are a difference of two entries
+        u_days = np.zeros(shifts.shape[:2], dtype=int)
+        for ri, dj in instance.u_positions:
+            u_days[ri, dj] += 1
+        u_cum = np.zeros((u_days.shape[0], u_days.shape[1] + 1), dtype=int)
+        np.cumsum(u_days, axis=1, out=u_cum[:, 1:])
+
         for i, _ in self.targets(instance):
             for j in range(0, max(0, len(days) - n_days + 1)):
-                lits = [
-                    shifts[(i, d, k)]
-                    for d in range(j, j + n_days)
-                    for k, _ in enumerate(state.ShiftType)
-                ]
-
-                u_extra = sum(
-                    1
-                    for ri, dj in instance.u_positions
-                    if ri == i and j <= dj < j + n_days
-                )
+                lits = shifts[i, j : j + n_days, :].ravel().tolist()
+
+                u_extra = int(u_cum[i, j + n_days] - u_cum[i, j])
 
-                model.Add(sum(lits) + u_extra < m_shifts).OnlyEnforceIf(enable)
+                model.Add(LinearExpr.Sum(lits) + u_extra < m_shifts).OnlyEnforceIf(
+                    enable
+                )
 
         return enable
 
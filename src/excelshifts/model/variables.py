@@ -7,16 +7,13 @@ for a given immutable `state.Instance`.
 
 from __future__ import annotations
 
-from typing import Any, Dict
-
+import numpy as np
 from ortools.sat.python import cp_model
 
 import excelshifts.state as state
 
 
-def create_shifts(
-    model: cp_model.CpModel, instance: state.Instance
-) -> Dict[tuple[int, int, int], Any]:
+def create_shifts(model: cp_model.CpModel, instance: state.Instance) -> np.ndarray:
     """
     Create the decision variables X[i,j,k] ∈ {0,1} indicating whether
     resident i is assigned to shift type k on day j.
@@ -30,12 +27,15 @@ def create_shifts(
 
     Returns
     -------
-    Dict[(int,int,int), BoolVar-like]
-        Mapping (i, j, k) -> BoolVar.
+    np.ndarray
+        Object array of shape (residents, days, shift types) holding the
+        BoolVars; `shifts[i, j, k]` is X[i,j,k] and slices give whole
+        rows, days or types at once.
     """
-    shifts: Dict[tuple[int, int, int], Any] = {}
-    for i, _ in enumerate(instance.residents):
-        for j, _ in enumerate(instance.days):
-            for k, _ in enumerate(state.ShiftType):
-                shifts[(i, j, k)] = model.NewBoolVar(f"shift_{i}_{j}_{k}")
+    shifts = np.empty(
+        (len(instance.residents), len(instance.days), len(state.ShiftType)),
+        dtype=object,
+    )
+    for i, j, k in np.ndindex(shifts.shape):
+        shifts[i, j, k] = model.NewBoolVar(f"shift_{i}_{j}_{k}")
     return shifts
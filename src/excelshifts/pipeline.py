@@ -12,6 +12,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional
 
+import numpy as np
 from ortools.sat.python import cp_model
 
 import excelshifts.state as state
@@ -31,25 +32,48 @@ class AssignmentResult:
     wall_time: float
     unsat_core: Optional[List[str]] = None
     relaxed_rules: List[str] = field(default_factory=list)
+    best_bound: Optional[float] = None
 
 
 def _extract_matrix(
     solver: cp_model.CpSolver,
     instance: state.Instance,
-    shifts: Dict[tuple[int, int, int], Any],
+    shifts: np.ndarray,
 ) -> List[List[str]]:
-    matrix: List[List[str]] = []
-    for i, _ in enumerate(instance.residents):
-        row: List[str] = []
-        for j, _ in enumerate(instance.days):
-            code = ""
-            for k, t in enumerate(state.ShiftType):
-                if solver.Value(shifts[(i, j, k)]):
-                    code = t.name
-                    break
-            row.append(code)
-        matrix.append(row)
-    return matrix
+    values = np.fromiter(
+        (solver.Value(x) for x in shifts.flat), dtype=np.int8, count=shifts.size
+    ).reshape(shifts.shape)
+    # First assigned shift type per (resident, day); "" where none is assigned
+    names = np.array([t.name for t in state.ShiftType], dtype=object)
+    matrix = np.where(values.any(axis=2), names[values.argmax(axis=2)], "")
+    return matrix.tolist()
+
+
+def _new_solver(
+    time_limit: Optional[float],
+    num_workers: int,
+    relative_gap_limit: Optional[float] = None,
+) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = num_workers
+    solver.parameters.log_search_progress = False
+    # Coverage and totals are linear; the stronger LP relaxation pays off
+    solver.parameters.linearization_level = 2
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = float(time_limit)
+    if relative_gap_limit is not None:
+        # Stop once the objective is provably within this fraction of optimal
+        solver.parameters.relative_gap_limit = float(relative_gap_limit)
+    return solver
+
+
+def _add_hint(
+    model: cp_model.CpModel, shifts: np.ndarray, matrix: List[List[str]]
+) -> None:
+    names = [t.name for t in state.ShiftType]
+    for (i, j), code in np.ndenumerate(np.array(matrix, dtype=object)):
+        for k, name in enumerate(names):
+            model.AddHint(shifts[i, j, k], int(code == name))
 
 
 def _assumptions(
@@ -95,9 +119,25 @@ def assign(
     instance: state.Instance,
     rules: list[BaseRule],
     time_limit: Optional[float] = None,
+    num_workers: int = 16,
+    relative_gap_limit: Optional[float] = None,
+    hint: Optional[List[List[str]]] = None,
 ) -> AssignmentResult:
-    """Solve an assignment for a given Instance, always relaxing constraints as needed."""
-    active_ids: Optional[set[str]] = None
+    """Solve an assignment for a given Instance, always relaxing constraints as needed.
+
+    `hint` is an optional shift matrix (e.g. a previous result for the same
+    residents and days) used as the starting point of the final solve.
+    """
+
+    if hint is not None:
+        # A ragged matrix has a 1-D shape, so it is rejected here too
+        hint_shape = np.array(hint, dtype=object).shape
+        grid_shape = (len(instance.residents), len(instance.days))
+        if hint_shape != grid_shape:
+            raise ValueError(
+                f"Hint shape {hint_shape} does not match the instance shape "
+                f"{grid_shape} (residents, days)."
+            )
 
     # Map rule_id -> PRIORITY from provided rule instances
     def _rid(r: BaseRule) -> str:
@@ -111,21 +151,17 @@ def assign(
     relaxed: List[str] = []
     first_core: Optional[List[str]] = None
 
+    # Every solve below uses the same model; only the assumed rule enables change
+    model, shifts, enables = build_model(
+        instance=instance,
+        rules=rules,
+    )
+    maximize_total_coverage(model, instance, shifts)
+    active_ids: set[str] = set(enables.keys())
+
     attempt = 0
     while True:
-        model, shifts, enables = build_model(
-            instance=instance,
-            rules=rules,
-        )
-
-        if active_ids is None:
-            active_ids = set(enables.keys())
-
-        maximize_total_coverage(model, instance, shifts)
-
-        solver = cp_model.CpSolver()
-        if time_limit is not None:
-            solver.parameters.max_time_in_seconds = float(time_limit)
+        solver = _new_solver(time_limit, num_workers, relative_gap_limit)
 
         assumptions = _assumptions(enables, active_ids)
         model.ClearAssumptions()
@@ -148,21 +184,13 @@ def assign(
                     # Tentatively re-enable and test feasibility
                     active_ids.add(rid)
 
-                    model_t, shifts_t, enables_t = build_model(
-                        instance=instance,
-                        rules=rules,
-                    )
-                    maximize_total_coverage(model_t, instance, shifts_t)
-
-                    solver_t = cp_model.CpSolver()
-                    if time_limit is not None:
-                        solver_t.parameters.max_time_in_seconds = float(time_limit)
+                    solver_t = _new_solver(time_limit, num_workers, relative_gap_limit)
 
-                    assumptions_t = _assumptions(enables_t, active_ids)
-                    model_t.ClearAssumptions()
-                    model_t.AddAssumptions(assumptions_t)
+                    assumptions_t = _assumptions(enables, active_ids)
+                    model.ClearAssumptions()
+                    model.AddAssumptions(assumptions_t)
 
-                    status_t = solver_t.Solve(model_t)
+                    status_t = solver_t.Solve(model)
                     print(
                         f"[Assignment] Attempting reenable, result: {solver.status_name(status_t)}"
                     )
@@ -173,25 +201,22 @@ def assign(
                     # Feasible -> keep enabled and continue trying to recover more rules
 
             # Final solve with trimmed active_ids to obtain matrix/objective and final relaxed set
-            model_f, shifts_f, enables_f = build_model(
-                instance=instance,
-                rules=rules,
-            )
-            maximize_total_coverage(model_f, instance, shifts_f)
-
-            solver_f = cp_model.CpSolver()
-            if time_limit is not None:
-                solver_f.parameters.max_time_in_seconds = float(time_limit)
+            solver_f = _new_solver(time_limit, num_workers, relative_gap_limit)
+            if hint is not None:
+                # Only the final solve is known to be feasible; hinting the
+                # relaxation probes slows down their infeasibility proofs
+                _add_hint(model, shifts, hint)
 
-            assumptions_f = _assumptions(enables_f, active_ids)
-            model_f.ClearAssumptions()
-            model_f.AddAssumptions(assumptions_f)
-            status_f = solver_f.Solve(model_f)
+            assumptions_f = _assumptions(enables, active_ids)
+            model.ClearAssumptions()
+            model.AddAssumptions(assumptions_f)
+            status_f = solver_f.Solve(model)
 
             if status_f not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
                 # Should not happen; fallback to original feasible result without trimming
                 matrix = _extract_matrix(solver, instance, shifts)
                 obj = solver.ObjectiveValue() if model.Proto().objective else None
+                bound = solver.BestObjectiveBound() if model.Proto().objective else None
                 return AssignmentResult(
                     matrix=matrix,
                     objective=obj,
@@ -199,12 +224,14 @@ def assign(
                     wall_time=solver.WallTime(),
                     unsat_core=first_core,
                     relaxed_rules=list(relaxed),
+                    best_bound=bound,
                 )
 
             # Success: return trimmed result
-            matrix = _extract_matrix(solver_f, instance, shifts_f)
-            obj = solver_f.ObjectiveValue() if model_f.Proto().objective else None
-            final_relaxed = [rid for rid in enables_f.keys() if rid not in active_ids]
+            matrix = _extract_matrix(solver_f, instance, shifts)
+            obj = solver_f.ObjectiveValue() if model.Proto().objective else None
+            bound = solver_f.BestObjectiveBound() if model.Proto().objective else None
+            final_relaxed = [rid for rid in enables.keys() if rid not in active_ids]
             return AssignmentResult(
                 matrix=matrix,
                 objective=obj,
@@ -212,6 +239,7 @@ def assign(
                 wall_time=solver_f.WallTime(),
                 unsat_core=first_core,
                 relaxed_rules=final_relaxed,
+                best_bound=bound,
             )
 
         if status != cp_model.INFEASIBLE:
@@ -276,6 +304,9 @@ def assign_excel(
     p_days: list[int],
     policy_path: str,
     time_limit: Optional[float] = None,
+    num_workers: int = 16,
+    relative_gap_limit: Optional[float] = None,
+    hint: Optional[List[List[str]]] = None,
     save: bool = False,
 ) -> AssignmentResult:
     """Load inputs from Excel, solve, and optionally write the result back to the sheet."""
@@ -297,6 +328,9 @@ def assign_excel(
         instance=inst,
         rules=rules,
         time_limit=time_limit,
+        num_workers=num_workers,
+        relative_gap_limit=relative_gap_limit,
+        hint=hint,
     )
 
     if save and result.matrix is not None:
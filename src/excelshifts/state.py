@@ -6,6 +6,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Literal
 
+import numpy as np
+
 __all__ = ["Day", "Resident", "ShiftType", "Instance", "Rank", "WEEKDAYS"]
 
 WEEKDAYS = ("L", "M", "X", "J", "V", "S", "D")
@@ -75,6 +77,9 @@ class Instance:
         presets: Tuple of preset assignments as (resident_idx, day_idx, shift_type)
         end_of_month: Index of the first day of the next month in days list (derived)
         p_days: Frozenset of day indices that are holidays (derived)
+        ranks: Read-only array with the rank of each resident (derived)
+        day_numbers: Read-only array with the day number of each day (derived)
+        weekdays: Read-only array with the day of the week of each day (derived)
     """
 
     residents: tuple[Resident, ...]
@@ -89,19 +94,37 @@ class Instance:
 
     end_of_month: int = field(init=False)
     p_days: frozenset[int] = field(init=False)
+    ranks: np.ndarray = field(init=False, repr=False, compare=False)
+    day_numbers: np.ndarray = field(init=False, repr=False, compare=False)
+    weekdays: np.ndarray = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
+        # Column views of residents and days for vectorized lookups
+        for name, values in (
+            ("ranks", [r.rank for r in self.residents]),
+            ("day_numbers", [d.number for d in self.days]),
+            ("weekdays", [d.day_of_week for d in self.days]),
+        ):
+            arr = np.array(values)
+            arr.flags.writeable = False
+            object.__setattr__(self, name, arr)
+
         # Detect end of month: first index where day number decreases; else len(days)
-        eom = len(self.days)
-        for idx in range(1, len(self.days)):
-            if self.days[idx].number < self.days[idx - 1].number:
-                eom = idx
-                break
+        drops = np.flatnonzero(np.diff(self.day_numbers) < 0)
+        eom = int(drops[0]) + 1 if drops.size else len(self.days)
         object.__setattr__(self, "end_of_month", eom)
 
         # Compute holiday indices from p_positions and extra_p_days
         pset = set(day_idx for (_, day_idx) in self.p_positions)
-        for day_idx, day in enumerate(self.days):
-            if day.number in self.extra_p_days:
-                pset.add(day_idx)
+        pset.update(
+            np.flatnonzero(np.isin(self.day_numbers, self.extra_p_days)).tolist()
+        )
         object.__setattr__(self, "p_days", frozenset(pset))
+
+    def day_indices(self, *weekdays: str) -> tuple[int, ...]:
+        """Returns the indices of the days falling on any of `weekdays`, in order."""
+        return tuple(np.flatnonzero(np.isin(self.weekdays, weekdays)).tolist())
+
+    def resident_indices(self, *ranks: str) -> tuple[int, ...]:
+        """Returns the indices of the residents holding any of `ranks`, in order."""
+        return tuple(np.flatnonzero(np.isin(self.ranks, ranks)).tolist())